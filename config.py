@@ -26,6 +26,14 @@ KM_PROMPT = "prompts/KM.txt"
 BASELINE_PROMPT = "prompts/Baseline.txt"
 RESPONSE_PROMPT = "prompts/RESPONSE.txt"
 
+# ============================================================
+# CONCURRENCY
+# ============================================================
+# Number of images processed concurrently (each image is bound by LLM latency)
+POSTER_CONCURRENCY = int(os.environ.get("POSTER_CONCURRENCY", 4))
+# Shared pool for the Stage-2 extractions (3 per image)
+POSTER_POOL_SIZE = int(os.environ.get("POSTER_POOL", POSTER_CONCURRENCY * 3))
+
 # ============================================================
 # ENSURE DIRECTORIES EXIST
 # ============================================================
@@ -1,7 +1,9 @@
-from .pooled_population import PooledPopulationExtractor
-from .km_survival import KMSurvivalExtractor
-from .baseline import BaselineExtractor
-from .response_outcomes import ResponseOutcomesExtractor
+_EXTRACTOR_MODULES = {
+    "PooledPopulationExtractor": ".pooled_population",
+    "KMSurvivalExtractor": ".km_survival",
+    "BaselineExtractor": ".baseline",
+    "ResponseOutcomesExtractor": ".response_outcomes",
+}
 
 __all__ = [
     "PooledPopulationExtractor",
@@ -9,3 +11,16 @@ __all__ = [
     "BaselineExtractor",
     "ResponseOutcomesExtractor"
 ]
+
+
+def __getattr__(name: str):
+    """Import extractor modules on first access (PEP 562)."""
+    module_name = _EXTRACTOR_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+
+    extractor_cls = getattr(import_module(module_name, __name__), name)
+    globals()[name] = extractor_cls
+    return extractor_cls
@@ -1,52 +1,50 @@
 import os
-import json
 import re
-import pandas as pd
 from typing import Dict, Any, List
 from pathlib import Path
 
-import vertexai
-from vertexai.preview.generative_models import GenerativeModel
-from google.oauth2 import service_account
-
-from schemas import BaselineOutput
+from schemas import BaselineOutput, validate_baseline
 from utils import (
-    load_text, load_json, load_image_for_vertexai, extract_first_json_object,
+    get_generative_model, load_text, save_json, extract_first_json_object,
     build_prompt_with_schema, to_int_or_none, to_float_or_none,
-    create_output_folders, cleanup_excel_empty_columns
-)
-from config import (
-    BASELINE_PROMPT, MODEL_NAME, SERVICE_ACCOUNT_FILE, PROJECT_ID, LOCATION
+    drop_empty_columns
 )
+from config import BASELINE_PROMPT
 from logger_config import setup_logger
 
+# Excel column order for baseline characteristics
+PREFERRED_BC_COLUMNS = (
+    "baseline_id", "trial_id", "trial_label", "arm_key", "arm_description",
+    "population_key", "population_type", "population_description",
+    "baseline_parent", "parent_description", "baseline_category_label",
+    "group_label", "group_text", "measure", "measure_value",
+    "population_n", "population_percentage"
+)
+
 
 class BaselineExtractor:
     """Extract baseline characteristics from poster images."""
 
     def __init__(self):
         self.logger = setup_logger("Baseline")
-        self.credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE
-        )
-        vertexai.init(project=PROJECT_ID, location=LOCATION, credentials=self.credentials)
-        self.model = GenerativeModel(MODEL_NAME)
         self.prompt_txt = load_text(BASELINE_PROMPT)
 
+    @property
+    def model(self):
+        """Shared Vertex AI model; initializes Vertex AI on first use."""
+        return get_generative_model()
+
     def extract(
         self,
-        image_path: str,
+        image,
         image_id: str,
-        pooled_json_path: str
+        pooled_schema: Dict[str, Any],
+        folders: dict
     ) -> BaselineOutput:
         """Extract baseline characteristics from image using pooled population schema."""
         self.logger.info(f"Processing {image_id}")
 
-        folders = create_output_folders(image_id)
-
-        input2_schema = load_json(pooled_json_path)
-        final_prompt = build_prompt_with_schema(self.prompt_txt, input2_schema)
-        image = load_image_for_vertexai(image_path)
+        final_prompt = build_prompt_with_schema(self.prompt_txt, pooled_schema)
 
         response = self.model.generate_content(
             contents=[final_prompt, image],
@@ -56,17 +54,13 @@ class BaselineExtractor:
         raw_text = response.text or ""
         parsed = extract_first_json_object(raw_text)
         filtered = self._clean_to_bc_only(parsed)
-        validated = BaselineOutput.model_validate(filtered, by_name=True)
+        validated = validate_baseline(filtered)
 
         output_json_path = Path(folders["json_folder"]) / f"{image_id}_baseline.json"
-        output_json_path.write_text(
-            validated.model_dump_json(indent=2, exclude_none=False),
-            encoding="utf-8"
-        )
+        save_json(validated.model_dump(exclude_none=True), str(output_json_path))
 
         output_excel_path = Path(folders["excel_folder"]) / f"{image_id}_baseline.xlsx"
         self._save_excel(validated, str(output_excel_path))
-        cleanup_excel_empty_columns(str(output_excel_path))
 
         self.logger.info(f"Saved Excel: {output_excel_path}")
         self.logger.info(f"Completed {image_id}")
@@ -128,19 +122,15 @@ class BaselineExtractor:
 
     def _save_excel(self, validated: BaselineOutput, excel_path: str):
         """Export baseline data to Excel."""
-        data = json.loads(validated.model_dump_json())
+        import pandas as pd
+
+        data = validated.model_dump()
         bc_rows = data.get("bc_types", []) or []
 
         df = pd.DataFrame(bc_rows)
 
         # Reorder columns
-        preferred_cols = [
-            "baseline_id", "trial_id", "trial_label", "arm_key", "arm_description",
-            "population_key", "population_type", "population_description",
-            "baseline_parent", "parent_description", "baseline_category_label",
-            "group_label", "group_text", "measure", "measure_value",
-            "population_n", "population_percentage"
-        ]
-        df = df.reindex(columns=[c for c in preferred_cols if c in df.columns])
+        df = df[pd.Index(PREFERRED_BC_COLUMNS).intersection(df.columns, sort=False)]
 
+        df = drop_empty_columns(df)
         df.to_excel(excel_path, index=False)
@@ -1,22 +1,14 @@
 import os
-import json
-import pandas as pd
 from typing import Dict, Any
 from pathlib import Path
 
-import vertexai
-from vertexai.preview.generative_models import GenerativeModel
-from google.oauth2 import service_account
-
-from schemas import SurvivalOutput
+from schemas import SurvivalOutput, validate_survival
 from utils import (
-    load_text, load_json, load_image_for_vertexai, extract_first_json_object,
-    build_prompt_with_schema, initialize_vertex_ai, create_output_folders,
-    cleanup_excel_empty_columns
-)
-from config import (
-    KM_PROMPT, MODEL_NAME, SERVICE_ACCOUNT_FILE, PROJECT_ID, LOCATION
+    load_text, save_json, extract_first_json_object,
+    build_prompt_with_schema, get_generative_model,
+    drop_empty_columns, outcomes_frame
 )
+from config import KM_PROMPT
 from logger_config import setup_logger
 
 
@@ -25,27 +17,24 @@ class KMSurvivalExtractor:
 
     def __init__(self):
         self.logger = setup_logger("KMSurvival")
-        self.credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE
-        )
-        vertexai.init(project=PROJECT_ID, location=LOCATION, credentials=self.credentials)
-        self.model = GenerativeModel(MODEL_NAME)
         self.prompt_txt = load_text(KM_PROMPT)
 
+    @property
+    def model(self):
+        """Shared Vertex AI model; initializes Vertex AI on first use."""
+        return get_generative_model()
+
     def extract(
         self,
-        image_path: str,
+        image,
         image_id: str,
-        pooled_json_path: str
+        pooled_schema: Dict[str, Any],
+        folders: dict
     ) -> SurvivalOutput:
         """Extract KM survival data from image using pooled population schema."""
         self.logger.info(f"Processing {image_id}")
 
-        folders = create_output_folders(image_id)
-
-        input2_schema = load_json(pooled_json_path)
-        final_prompt = build_prompt_with_schema(self.prompt_txt, input2_schema)
-        image = load_image_for_vertexai(image_path)
+        final_prompt = build_prompt_with_schema(self.prompt_txt, pooled_schema)
 
         response = self.model.generate_content(
             contents=[final_prompt, image],
@@ -55,17 +44,13 @@ class KMSurvivalExtractor:
         raw_text = response.text or ""
         parsed = extract_first_json_object(raw_text)
         filtered = self._clean_to_survival_only(parsed)
-        validated = SurvivalOutput.model_validate(filtered, by_name=True)
+        validated = validate_survival(filtered)
 
         output_json_path = Path(folders["json_folder"]) / f"{image_id}_km_survival.json"
-        output_json_path.write_text(
-            validated.model_dump_json(indent=2),
-            encoding="utf-8"
-        )
+        save_json(validated.model_dump(), str(output_json_path))
 
         output_excel_path = Path(folders["excel_folder"]) / f"{image_id}_km_survival.xlsx"
         self._save_excel(validated, str(output_excel_path))
-        cleanup_excel_empty_columns(str(output_excel_path))
 
         self.logger.info(f"Saved Excel: {output_excel_path}")
         self.logger.info(f"Completed {image_id}")
@@ -98,15 +83,10 @@ class KMSurvivalExtractor:
 
     def _save_excel(self, validated: SurvivalOutput, excel_path: str):
         """Export survival data to Excel with flattened structure."""
-        data = json.loads(validated.model_dump_json())
+        data = validated.model_dump()
         trial_metadata = data.get("trial_metadata", {}) or {}
         arm_outcomes = data.get("arm_level_survival_outcomes", []) or []
 
-        rows = []
-        for row in arm_outcomes:
-            if isinstance(row, dict):
-                merged = {**trial_metadata, **row}
-                rows.append(merged)
-
-        df = pd.DataFrame(rows)
+        df = outcomes_frame(trial_metadata, arm_outcomes)
+        df = drop_empty_columns(df)
         df.to_excel(excel_path, index=False)
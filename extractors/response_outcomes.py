@@ -1,21 +1,14 @@
 import os
-import json
-import pandas as pd
 from typing import Dict, Any, List
 from pathlib import Path
 
-import vertexai
-from vertexai.preview.generative_models import GenerativeModel
-from google.oauth2 import service_account
-
-from schemas import ResponseOutput
+from schemas import ResponseOutput, validate_response
 from utils import (
-    load_text, load_json, load_image_for_vertexai, extract_first_json_object,
-    build_prompt_with_schema, create_output_folders, cleanup_excel_empty_columns
-)
-from config import (
-    RESPONSE_PROMPT, MODEL_NAME, SERVICE_ACCOUNT_FILE, PROJECT_ID, LOCATION
+    get_generative_model, load_text, save_json, extract_first_json_object,
+    build_prompt_with_schema, drop_empty_columns,
+    outcomes_frame
 )
+from config import RESPONSE_PROMPT
 from logger_config import setup_logger
 
 
@@ -24,27 +17,24 @@ class ResponseOutcomesExtractor:
 
     def __init__(self):
         self.logger = setup_logger("ResponseOutcomes")
-        self.credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE
-        )
-        vertexai.init(project=PROJECT_ID, location=LOCATION, credentials=self.credentials)
-        self.model = GenerativeModel(MODEL_NAME)
         self.prompt_txt = load_text(RESPONSE_PROMPT)
 
+    @property
+    def model(self):
+        """Shared Vertex AI model; initializes Vertex AI on first use."""
+        return get_generative_model()
+
     def extract(
         self,
-        image_path: str,
+        image,
         image_id: str,
-        pooled_json_path: str
+        pooled_schema: Dict[str, Any],
+        folders: dict
     ) -> ResponseOutput:
         """Extract response outcomes from image using pooled population schema."""
         self.logger.info(f"Processing {image_id}")
 
-        folders = create_output_folders(image_id)
-
-        input2_schema = load_json(pooled_json_path)
-        final_prompt = build_prompt_with_schema(self.prompt_txt, input2_schema)
-        image = load_image_for_vertexai(image_path)
+        final_prompt = build_prompt_with_schema(self.prompt_txt, pooled_schema)
 
         response = self.model.generate_content(
             contents=[final_prompt, image],
@@ -54,17 +44,13 @@ class ResponseOutcomesExtractor:
         raw_text = response.text or ""
         parsed = extract_first_json_object(raw_text)
         filtered = self._clean_to_response_only(parsed)
-        validated = ResponseOutput.model_validate(filtered)
+        validated = validate_response(filtered)
 
         output_json_path = Path(folders["json_folder"]) / f"{image_id}_response_outcomes.json"
-        output_json_path.write_text(
-            validated.model_dump_json(indent=2),
-            encoding="utf-8"
-        )
+        save_json(validated.model_dump(), str(output_json_path))
 
         output_excel_path = Path(folders["excel_folder"]) / f"{image_id}_response_outcomes.xlsx"
         self._save_excel(validated, str(output_excel_path))
-        cleanup_excel_empty_columns(str(output_excel_path))
 
         self.logger.info(f"Saved Excel: {output_excel_path}")
         self.logger.info(f"Completed {image_id}")
@@ -99,35 +85,10 @@ class ResponseOutcomesExtractor:
 
     def _save_excel(self, validated: ResponseOutput, excel_path: str):
         """Export response data to Excel with flattened result columns."""
-        data = json.loads(validated.model_dump_json())
+        data = validated.model_dump()
         trial_metadata = data.get("trial_metadata", {}) or {}
         arm_outcomes = data.get("arm_level_response_outcomes", []) or []
 
-        flattened_rows = []
-
-        for row in arm_outcomes:
-            if not isinstance(row, dict):
-                continue
-
-            result = row.pop("result", {}) or {}
-
-            flattened = {
-                **trial_metadata,
-                **row,
-                # Flatten result fields
-                "result_n": result.get("n"),
-                "result_percentage": result.get("percentage"),
-                "result_min": result.get("min"),
-                "result_max": result.get("max"),
-                "result_p_value": result.get("p_value"),
-                "result_odds_ratio": result.get("odds_ratio"),
-                "result_median": result.get("median"),
-                "result_min_duration": result.get("min_duration"),
-                "result_max_duration": result.get("max_duration"),
-                "result_duration_unit": result.get("duration_unit")
-            }
-
-            flattened_rows.append(flattened)
-
-        df = pd.DataFrame(flattened_rows)
+        df = outcomes_frame(trial_metadata, arm_outcomes, nested_key="result")
+        df = drop_empty_columns(df)
         df.to_excel(excel_path, index=False)
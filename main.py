@@ -24,7 +24,10 @@ def main():
     try:
         # Initialize and run pipeline
         pipeline = PosterPipeline()
-        results = pipeline.process_all_images()
+        try:
+            results = pipeline.process_all_images()
+        finally:
+            pipeline.close()
 
         # Summary
         print("\n" + "="*60)
@@ -1,27 +1,68 @@
 import os
+from collections import Counter
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Tuple
+from functools import cached_property
+from typing import TYPE_CHECKING, List, Tuple
 
-from extractors import (
-    PooledPopulationExtractor,
-    KMSurvivalExtractor,
-    BaselineExtractor,
-    ResponseOutcomesExtractor
+from config import INPUT_FOLDER, POSTER_CONCURRENCY, POSTER_POOL_SIZE
+from utils import (
+    ensure_token, get_generative_model, create_output_folders,
+    load_image_part, load_image_for_vertexai
 )
-from config import INPUT_FOLDER
 from logger_config import setup_logger
 
+if TYPE_CHECKING:
+    from extractors import (
+        PooledPopulationExtractor,
+        KMSurvivalExtractor,
+        BaselineExtractor,
+        ResponseOutcomesExtractor
+    )
+
 
 class PosterPipeline:
     """Pipeline orchestrator for poster data extraction."""
 
     def __init__(self):
         self.logger = setup_logger("Pipeline")
-        self.pooled_extractor = PooledPopulationExtractor()
-        self.km_extractor = KMSurvivalExtractor()
-        self.baseline_extractor = BaselineExtractor()
-        self.response_extractor = ResponseOutcomesExtractor()
+
+        # Shared across images so Stage-2 tasks don't create a pool per image
+        self._pool = ThreadPoolExecutor(max_workers=POSTER_POOL_SIZE, thread_name_prefix="poster")
+
+    # Extractors (and their modules) are loaded on first access so an empty run
+    # imports and constructs none of them; process_all_images builds all four
+    # before any image is submitted
+
+    @cached_property
+    def pooled_extractor(self) -> "PooledPopulationExtractor":
+        from extractors import PooledPopulationExtractor
+
+        return PooledPopulationExtractor()
+
+    @cached_property
+    def km_extractor(self) -> "KMSurvivalExtractor":
+        from extractors import KMSurvivalExtractor
+
+        return KMSurvivalExtractor()
+
+    @cached_property
+    def baseline_extractor(self) -> "BaselineExtractor":
+        from extractors import BaselineExtractor
+
+        return BaselineExtractor()
+
+    @cached_property
+    def response_extractor(self) -> "ResponseOutcomesExtractor":
+        from extractors import ResponseOutcomesExtractor
+
+        return ResponseOutcomesExtractor()
+
+    def close(self):
+        """Shut down the shared extraction thread pool."""
+        # Callers collect every future they submit, so anything still queued here
+        # is left over from an interrupted run and is dropped rather than run
+        self._pool.shutdown(wait=False, cancel_futures=True)
 
     def process_image(self, image_path: str) -> dict:
         """Process a single image through the complete pipeline."""
@@ -39,15 +80,20 @@ class PosterPipeline:
             "response_outcomes": None
         }
 
-        self.logger.info("[STAGE 1] Pooled Population Extraction")
-        pooled_result = self.pooled_extractor.extract(image_path, image_id)
-        results["pooled_population"] = pooled_result
+        folders = create_output_folders(image_id)
+
+        # Read the image once; both SDK wrappers are built from the same bytes
+        image_bytes = Path(image_path).read_bytes()
+        image_part = load_image_part(image_path, image_bytes)
+        image = load_image_for_vertexai(image_path, image_bytes)
 
-        pooled_json_path = f"json_output/{image_id}/{image_id}_pooled_population.json"
+        self.logger.info(f"[STAGE 1] Pooled Population Extraction: {image_id}")
+        pooled_result, pooled_schema = self.pooled_extractor.extract(image_part, image_id, folders)
+        results["pooled_population"] = pooled_result
 
-        self.logger.info("[STAGE 2] Parallel Extraction (KM, Baseline, Response)")
+        self.logger.info(f"[STAGE 2] Parallel Extraction (KM, Baseline, Response): {image_id}")
         parallel_results = self._run_parallel_extractions(
-            image_path, image_id, pooled_json_path
+            image, image_id, pooled_schema, folders
         )
 
         results.update(parallel_results)
@@ -60,9 +106,10 @@ class PosterPipeline:
 
     def _run_parallel_extractions(
         self,
-        image_path: str,
+        image,
         image_id: str,
-        pooled_json_path: str
+        pooled_schema: dict,
+        folders: dict
     ) -> dict:
         """Run KM, Baseline, and Response extractions in parallel."""
         results = {
@@ -72,26 +119,25 @@ class PosterPipeline:
         }
 
         tasks = [
-            ("km_survival", self.km_extractor.extract, (image_path, image_id, pooled_json_path)),
-            ("baseline", self.baseline_extractor.extract, (image_path, image_id, pooled_json_path)),
-            ("response_outcomes", self.response_extractor.extract, (image_path, image_id, pooled_json_path))
+            ("km_survival", self.km_extractor.extract, (image, image_id, pooled_schema, folders)),
+            ("baseline", self.baseline_extractor.extract, (image, image_id, pooled_schema, folders)),
+            ("response_outcomes", self.response_extractor.extract, (image, image_id, pooled_schema, folders))
         ]
 
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            future_to_task = {
-                executor.submit(task_func, *task_args): task_name
-                for task_name, task_func, task_args in tasks
-            }
+        future_to_task = {
+            self._pool.submit(task_func, *task_args): task_name
+            for task_name, task_func, task_args in tasks
+        }
 
-            for future in as_completed(future_to_task):
-                task_name = future_to_task[future]
-                try:
-                    result = future.result()
-                    results[task_name] = result
-                    self.logger.info(f"[Parallel] {task_name} completed")
-                except Exception as e:
-                    self.logger.error(f"[Parallel] {task_name} failed: {e}")
-                    results[task_name] = None
+        for future in as_completed(future_to_task):
+            task_name = future_to_task[future]
+            try:
+                result = future.result()
+                results[task_name] = result
+                self.logger.info(f"[Parallel] {task_name} completed for {image_id}")
+            except Exception as e:
+                self.logger.error(f"[Parallel] {task_name} failed for {image_id}: {e}")
+                results[task_name] = None
 
         return results
 
@@ -102,29 +148,64 @@ class PosterPipeline:
 
     def process_all_images(self) -> List[dict]:
         """Process all images in the input folder."""
-        image_files = [
-            f for f in os.listdir(INPUT_FOLDER)
-            if f.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))
-        ]
+        with os.scandir(INPUT_FOLDER) as entries:
+            image_paths = [
+                entry.path for entry in entries
+                if entry.is_file() and entry.name.lower().endswith((".jpg", ".jpeg", ".png", ".webp"))
+            ]
 
-        if not image_files:
+        if not image_paths:
             self.logger.warning(f"No images found in {INPUT_FOLDER}")
             return []
 
-        self.logger.info(f"Found {len(image_files)} image(s) to process")
-
-        all_results = []
-        for image_file in image_files:
-            image_path = os.path.join(INPUT_FOLDER, image_file)
-            try:
-                results = self.process_image(image_path)
-                all_results.append(results)
-            except Exception as e:
-                self.logger.error(f"Failed to process {image_file}: {e}")
-                all_results.append({
-                    "image_id": Path(image_file).stem,
+        self.logger.info(f"Found {len(image_paths)} image(s) to process")
+
+        # Outputs are keyed by file stem, so a.png and a.jpg would write the same
+        # files concurrently; reject every image whose stem is not unique
+        results_by_path = {}
+        stem_counts = Counter(Path(image_path).stem for image_path in image_paths)
+        for image_path in image_paths:
+            image_id = Path(image_path).stem
+            if stem_counts[image_id] > 1:
+                self.logger.error(f"Skipping {image_path}: another input image has the stem {image_id!r}")
+                results_by_path[image_path] = {
+                    "image_id": image_id,
                     "image_path": image_path,
-                    "error": str(e)
-                })
+                    "error": f"Duplicate image_id {image_id!r} (output folders are keyed by file stem)"
+                }
+
+        # Build the extractors up front so a bad prompt path fails once here,
+        # not per image after Stage 1 has already run
+        for name in ("pooled_extractor", "km_extractor", "baseline_extractor", "response_extractor"):
+            getattr(self, name)
+
+        # Authenticate once, before worker threads start issuing requests
+        ensure_token()
+        get_generative_model()
+
+        executor = ThreadPoolExecutor(max_workers=POSTER_CONCURRENCY)
+        try:
+            future_to_path = {
+                executor.submit(self.process_image, image_path): image_path
+                for image_path in image_paths
+                if image_path not in results_by_path
+            }
 
-        return all_results
+            for future in as_completed(future_to_path):
+                image_path = future_to_path[future]
+                try:
+                    results_by_path[image_path] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to process {image_path}: {e}")
+                    results_by_path[image_path] = {
+                        "image_id": Path(image_path).stem,
+                        "image_path": image_path,
+                        "error": str(e)
+                    }
+        except BaseException:
+            # e.g. Ctrl-C: drop queued images instead of running them all first
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+        return [results_by_path[image_path] for image_path in image_paths]
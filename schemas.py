@@ -1,5 +1,36 @@
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import List, Optional, Literal
+from pydantic import AfterValidator, BaseModel, Field, ConfigDict, TypeAdapter, with_config
+from typing import Annotated, Any, List, Optional, Literal, get_type_hints
+from dataclasses import field
+from pydantic.dataclasses import dataclass
+from typing_extensions import TypedDict, is_typeddict
+
+# Row-level records are slotted pydantic dataclasses rather than BaseModels: no
+# per-instance __dict__, which matters for outputs with hundreds of rows. They are
+# only ever validated/dumped through their parent *Output models.
+record = dataclass(config=ConfigDict(extra="forbid"), slots=True, kw_only=True)
+
+# Leaf sub-objects are TypedDicts rather than nested BaseModels: pydantic-core
+# validates them inline without a separate model validator per object.
+
+
+def _null_defaults(schema: dict) -> None:
+    """Give every leaf property "default": null, as the BaseModels they replaced had."""
+    for prop in schema.get("properties", {}).values():
+        prop["default"] = None
+
+
+leaf = with_config(ConfigDict(extra="forbid", json_schema_extra=_null_defaults))
+
+
+def all_keys(typed_dict):
+    """
+    Annotate a total=False TypedDict so validated values carry every declared key.
+
+    Missing keys are filled with None, so dumps keep the same shape the BaseModels
+    these replaced produced (e.g. {"type": null} rather than {}).
+    """
+    keys = tuple(typed_dict.__annotations__)
+    return Annotated[typed_dict, AfterValidator(lambda value: {**dict.fromkeys(keys), **value})]
 
 
 # ============================================================
@@ -32,31 +63,43 @@ IntegratedType = Literal[
 ]
 
 
-class DesignSummary(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-    type: Optional[str] = None
+@leaf
+class DesignSummary(TypedDict, total=False):
+    type: Optional[str]
 
 
-class TrialPopulationDetails(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-    type: Optional[str] = None
+@leaf
+class TrialPopulationDetails(TypedDict, total=False):
+    type: Optional[str]
 
 
-class TrialRecord(BaseModel):
-    model_config = ConfigDict(extra="forbid")
+@record
+class TrialRecord:
     trial_key: str
-    trial_id_list: List[str] = Field(default_factory=list)
+    trial_id_list: List[str] = field(default_factory=list)
     trial_label: Optional[str] = None
     phase: Optional[str] = None
     study_name: Optional[str] = None
     allocation: Optional[str] = None
-    design_summary: DesignSummary
-    trial_population_details: TrialPopulationDetails
+    design_summary: all_keys(DesignSummary)
+    trial_population_details: all_keys(TrialPopulationDetails)
     overall_N: Optional[str] = None
 
 
-class ArmRecord(BaseModel):
-    model_config = ConfigDict(extra="forbid")
+# Flat column names for a dumped TrialRecord, in schema order, with the TypedDict
+# sub-objects expanded to "parent.key" (the same names pd.json_normalize produces).
+TRIAL_RECORD_COLUMNS = tuple(
+    column
+    for name, hint in get_type_hints(TrialRecord).items()
+    for column in (
+        [f"{name}.{key}" for key in hint.__annotations__]
+        if is_typeddict(hint) else [name]
+    )
+)
+
+
+@record
+class ArmRecord:
     arm_key: str
     arm_name: Optional[str] = None
     arm_type: Optional[ArmType] = None
@@ -64,8 +107,8 @@ class ArmRecord(BaseModel):
     dose_schedule: Optional[str] = None
 
 
-class PopulationRecord(BaseModel):
-    model_config = ConfigDict(extra="forbid")
+@record
+class PopulationRecord:
     population_key: str
     population_type: PopulationType
     parent: Optional[str] = None
@@ -74,28 +117,28 @@ class PopulationRecord(BaseModel):
     N: Optional[str] = None
 
 
-class TrialArmLink(BaseModel):
-    model_config = ConfigDict(extra="forbid")
+@record
+class TrialArmLink:
     trial_key: str
-    linked_arm_keys: List[str] = Field(default_factory=list)
+    linked_arm_keys: List[str] = field(default_factory=list)
 
 
-class TrialPopulationLink(BaseModel):
-    model_config = ConfigDict(extra="forbid")
+@record
+class TrialPopulationLink:
     trial_key: str
-    linked_population_keys: List[str] = Field(default_factory=list)
-    linked_arm_keys: List[str] = Field(default_factory=list)
+    linked_population_keys: List[str] = field(default_factory=list)
+    linked_arm_keys: List[str] = field(default_factory=list)
 
 
-class IntegratedRecord(BaseModel):
-    model_config = ConfigDict(extra="forbid")
+@record
+class IntegratedRecord:
     integrated_key: str
     integrated_type: IntegratedType
-    source_trial_keys: List[str] = Field(default_factory=list)
+    source_trial_keys: List[str] = field(default_factory=list)
     population_description: Optional[str] = None
     N: Optional[str] = None
-    linked_population_keys: List[str] = Field(default_factory=list)
-    linked_arm_keys: List[str] = Field(default_factory=list)
+    linked_population_keys: List[str] = field(default_factory=list)
+    linked_arm_keys: List[str] = field(default_factory=list)
 
 
 class MultiTrialExtractionOutput(BaseModel):
@@ -115,17 +158,16 @@ class MultiTrialExtractionOutput(BaseModel):
 TimeUnit = Literal["months", "years", "weeks", "days"]
 
 
-class TrialMetadata(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-    trial_id: Optional[str] = None
-    phase: Optional[str] = None
-    study_name: Optional[str] = None
+@leaf
+class TrialMetadata(TypedDict, total=False):
+    trial_id: Optional[str]
+    phase: Optional[str]
+    study_name: Optional[str]
 
 
-class ArmLevelSurvivalOutcome(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-
-    survival_outcome_id: int
+@record
+class ArmLevelSurvivalOutcome:
+    survival_outcome_id: Annotated[int, Field(ge=1)]
     trial_id: Optional[str] = None
     trial_label: Optional[str] = None
     arm_description: Optional[str] = None
@@ -142,44 +184,19 @@ class ArmLevelSurvivalOutcome(BaseModel):
     review_criteria: Optional[str] = None
     other_details: Optional[str] = None
 
-    arm_n: Optional[int] = None
+    arm_n: Annotated[Optional[int], Field(ge=0)] = None
     median_survival: Optional[str] = None
     survival_rate: Optional[str] = None
-    events_n: Optional[int] = None
-    assessment_denominator_n: Optional[int] = None
+    events_n: Annotated[Optional[int], Field(ge=0)] = None
+    assessment_denominator_n: Annotated[Optional[int], Field(ge=0)] = None
 
-    p_value: Optional[float] = None
+    p_value: Annotated[Optional[float], Field(ge=0, le=1)] = None
     time_unit: Optional[TimeUnit] = None
 
-    @field_validator("survival_outcome_id")
-    @classmethod
-    def survival_id_positive(cls, v: int) -> int:
-        if v <= 0:
-            raise ValueError("survival_outcome_id must be >= 1")
-        return v
-
-    @field_validator("arm_n", "events_n", "assessment_denominator_n")
-    @classmethod
-    def non_negative_ints(cls, v: Optional[int]) -> Optional[int]:
-        if v is None:
-            return v
-        if v < 0:
-            raise ValueError("Count fields must be >= 0")
-        return v
-
-    @field_validator("p_value")
-    @classmethod
-    def p_value_range(cls, v: Optional[float]) -> Optional[float]:
-        if v is None:
-            return v
-        if v < 0 or v > 1:
-            raise ValueError("p_value must be between 0 and 1")
-        return v
-
 
 class SurvivalOutput(BaseModel):
     model_config = ConfigDict(extra="forbid")
-    trial_metadata: TrialMetadata = Field(default_factory=TrialMetadata)
+    trial_metadata: all_keys(TrialMetadata) = Field(default_factory=dict, validate_default=True)
     arm_level_survival_outcomes: List[ArmLevelSurvivalOutcome] = Field(default_factory=list)
 
 
@@ -187,13 +204,12 @@ class SurvivalOutput(BaseModel):
 # BASELINE CHARACTERISTICS SCHEMAS
 # ============================================================
 
-BaselineParent = Literal["Overall", "Cohort", "Subgroup", "Other", None]
+BaselineParent = Optional[Literal["Overall", "Cohort", "Subgroup", "Other"]]
 
 
-class BaselineCharacteristic(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-
-    baseline_id: int = Field(..., description="Sequential ID starting from 1")
+@record
+class BaselineCharacteristic:
+    baseline_id: Annotated[int, Field(ge=1, description="Sequential ID starting from 1")]
 
     trial_id: Optional[str] = None
     trial_label: Optional[str] = None
@@ -215,33 +231,8 @@ class BaselineCharacteristic(BaseModel):
     measure: Optional[str] = None
     measure_value: Optional[str] = None
 
-    population_n: Optional[int] = None
-    population_percentage: Optional[float] = None
-
-    @field_validator("baseline_id")
-    @classmethod
-    def baseline_id_positive(cls, v: int) -> int:
-        if v <= 0:
-            raise ValueError("baseline_id must be >= 1")
-        return v
-
-    @field_validator("population_n")
-    @classmethod
-    def non_negative_n(cls, v: Optional[int]) -> Optional[int]:
-        if v is None:
-            return v
-        if v < 0:
-            raise ValueError("population_n must be >= 0")
-        return v
-
-    @field_validator("population_percentage")
-    @classmethod
-    def percent_range(cls, v: Optional[float]) -> Optional[float]:
-        if v is None:
-            return v
-        if v < 0 or v > 100:
-            raise ValueError("population_percentage must be between 0 and 100")
-        return v
+    population_n: Annotated[Optional[int], Field(ge=0)] = None
+    population_percentage: Annotated[Optional[float], Field(ge=0, le=100)] = None
 
 
 class BaselineOutput(BaseModel):
@@ -256,27 +247,25 @@ class BaselineOutput(BaseModel):
 ResponseMetricClass = Literal["rate", "duration", "time_to_response"]
 
 
-class ResultObject(BaseModel):
-    model_config = ConfigDict(extra="forbid")
+@leaf
+class ResultObject(TypedDict, total=False):
+    n: Optional[int]
+    percentage: Optional[float]
+    min: Optional[float]
+    max: Optional[float]
 
-    n: Optional[int] = None
-    percentage: Optional[float] = None
-    min: Optional[float] = None
-    max: Optional[float] = None
+    p_value: Optional[float]
+    odds_ratio: Optional[float]
 
-    p_value: Optional[float] = None
-    odds_ratio: Optional[float] = None
+    median: Optional[float]
+    min_duration: Optional[float]
+    max_duration: Optional[float]
+    duration_unit: Optional[TimeUnit]
 
-    median: Optional[float] = None
-    min_duration: Optional[float] = None
-    max_duration: Optional[float] = None
-    duration_unit: Optional[TimeUnit] = None
 
-
-class ArmLevelResponseOutcome(BaseModel):
-    model_config = ConfigDict(extra="forbid")
-
-    response_outcome_id: int
+@record
+class ArmLevelResponseOutcome:
+    response_outcome_id: Annotated[int, Field(ge=1)]
 
     trial_id: Optional[str] = None
     trial_label: Optional[str] = None
@@ -291,32 +280,39 @@ class ArmLevelResponseOutcome(BaseModel):
     review_criteria: Optional[str] = None
     other_details: Optional[str] = None
 
-    arm_n: Optional[int] = None
-    assessment_denominator_n: Optional[int] = None
+    arm_n: Annotated[Optional[int], Field(ge=0)] = None
+    assessment_denominator_n: Annotated[Optional[int], Field(ge=0)] = None
 
     response_type_name: Optional[str] = None
     response_metric_class: Optional[ResponseMetricClass] = None
 
-    result: Optional[ResultObject] = None
-
-    @field_validator("response_outcome_id")
-    @classmethod
-    def id_positive(cls, v: int) -> int:
-        if v <= 0:
-            raise ValueError("response_outcome_id must be >= 1")
-        return v
-
-    @field_validator("arm_n", "assessment_denominator_n")
-    @classmethod
-    def non_negative_ints(cls, v: Optional[int]) -> Optional[int]:
-        if v is None:
-            return v
-        if v < 0:
-            raise ValueError("Count fields must be >= 0")
-        return v
+    result: Optional[all_keys(ResultObject)] = None
 
 
 class ResponseOutput(BaseModel):
     model_config = ConfigDict(extra="forbid")
-    trial_metadata: TrialMetadata = Field(default_factory=TrialMetadata)
+    trial_metadata: all_keys(TrialMetadata) = Field(default_factory=dict, validate_default=True)
     arm_level_response_outcomes: List[ArmLevelResponseOutcome] = Field(default_factory=list)
+
+
+# ============================================================
+# CACHED VALIDATORS
+# ============================================================
+# Build each TypeAdapter once at import and reuse it for every validation.
+
+MULTI_TRIAL_ADAPTER = TypeAdapter(MultiTrialExtractionOutput)
+SURVIVAL_ADAPTER = TypeAdapter(SurvivalOutput)
+BASELINE_ADAPTER = TypeAdapter(BaselineOutput)
+RESPONSE_ADAPTER = TypeAdapter(ResponseOutput)
+
+
+def validate_survival(data: Any) -> SurvivalOutput:
+    return SURVIVAL_ADAPTER.validate_python(data, by_name=True)
+
+
+def validate_baseline(data: Any) -> BaselineOutput:
+    return BASELINE_ADAPTER.validate_python(data, by_name=True)
+
+
+def validate_response(data: Any) -> ResponseOutput:
+    return RESPONSE_ADAPTER.validate_python(data)
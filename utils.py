@@ -1,35 +1,93 @@
 import json
+import os
 import re
+import threading
+import warnings
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 
-import pandas as pd
-import vertexai
-from google import genai
-from google.genai import types
-from google.oauth2 import service_account
+try:
+    import orjson
+except ImportError:  # stdlib json fallback in load_json/save_json
+    orjson = None
 
-from config import SERVICE_ACCOUNT_FILE, PROJECT_ID, LOCATION
+from config import SERVICE_ACCOUNT_FILE, PROJECT_ID, LOCATION, MODEL_NAME
 from logger_config import setup_logger
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from pydantic import BaseModel
+    from google.genai import types
+
 logger = setup_logger("Utils")
 
+# Credentials, the GenAI client and GenerativeModels are created once per process
+# and shared across extractors/threads. Tests can reset them with
+# get_credentials.cache_clear(), get_genai_client.cache_clear() and
+# _build_generative_model.cache_clear() (plus setting _vertex_initialized = False).
+_vertex_initialized = False
+# Re-entrant: get_generative_model holds it while calling initialize_vertex_ai
+_vertex_lock = threading.RLock()
+
+
+@lru_cache(maxsize=1)
 def get_credentials():
-    """Get Google Cloud credentials from service account file."""
+    """Get Google Cloud credentials from service account file (cached per process)."""
+    from google.oauth2 import service_account
+
     return service_account.Credentials.from_service_account_file(
         SERVICE_ACCOUNT_FILE
     ).with_scopes(["https://www.googleapis.com/auth/cloud-platform"])
 
 
+def ensure_token(credentials=None):
+    """Refresh the shared credentials only when the cached access token is missing or expired."""
+    from google.auth.transport.requests import Request
+
+    credentials = credentials or get_credentials()
+    if credentials.expired or not credentials.valid:
+        credentials.refresh(Request())
+    return credentials
+
+
 def initialize_vertex_ai():
-    """Initialize Vertex AI with credentials."""
+    """Initialize Vertex AI with credentials (runs vertexai.init once per process)."""
+    global _vertex_initialized
+    import vertexai
+
     credentials = get_credentials()
-    vertexai.init(project=PROJECT_ID, location=LOCATION, credentials=credentials)
+    with _vertex_lock:
+        if not _vertex_initialized:
+            vertexai.init(project=PROJECT_ID, location=LOCATION, credentials=credentials)
+            _vertex_initialized = True
     return credentials
 
 
+def get_generative_model(model_name: str = MODEL_NAME):
+    """
+    Get a shared Vertex AI GenerativeModel for the given model name.
+
+    This is the only Vertex entry point: vertexai.init runs lazily on the
+    first call, so nothing authenticates until a model is actually needed.
+    """
+    with _vertex_lock:
+        return _build_generative_model(model_name)
+
+
+@lru_cache(maxsize=None)
+def _build_generative_model(model_name: str):
+    from vertexai.preview.generative_models import GenerativeModel
+
+    initialize_vertex_ai()
+    return GenerativeModel(model_name)
+
+
+@lru_cache(maxsize=1)
 def get_genai_client():
-    """Get Google GenAI client."""
+    """Get Google GenAI client (cached per process; the client is thread-safe)."""
+    from google import genai
+
     credentials = get_credentials()
     client = genai.Client(
         vertexai=True,
@@ -44,88 +102,183 @@ def get_genai_client():
 # FILE UTILITIES
 # ============================================================
 
+@lru_cache(maxsize=None)
 def load_text(file_path: str) -> str:
-    """Load text content from a file."""
+    """Load text content from a file (cached per process; used for prompt files)."""
     return Path(file_path).read_text(encoding="utf-8")
 
 
 def load_json(file_path: str) -> Dict[str, Any]:
     """Load JSON content from a file."""
-    return json.loads(Path(file_path).read_text(encoding="utf-8"))
+    if orjson is None:
+        return json.loads(Path(file_path).read_text(encoding="utf-8"))
+    return orjson.loads(Path(file_path).read_bytes())
+
+
+def load_trusted(cls: "type[BaseModel]", file_path: str) -> "BaseModel":
+    """
+    Load a JSON file written by this pipeline into cls without validating it.
+
+    Only use this for files the pipeline itself saved from an already-validated
+    model; LLM output must always go through the schema validators. Missing fields
+    get their defaults, but nested records stay plain dicts (model_construct does
+    not recurse), so read them as dicts and do not model_dump the result.
+    """
+    return cls.model_construct(**load_json(file_path))
 
 
 def save_json(data: Any, file_path: str):
-    """Save data as JSON to a file."""
-    Path(file_path).write_text(
-        json.dumps(data, indent=2, ensure_ascii=False),
-        encoding="utf-8"
+    """Save data as UTF-8 JSON (2-space indent) to a file."""
+    if orjson is None:
+        Path(file_path).write_text(
+            json.dumps(data, indent=2, ensure_ascii=False),
+            encoding="utf-8"
+        )
+        return
+    Path(file_path).write_bytes(
+        orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
     )
 
 
-def load_image_part(image_path: str) -> types.Part:
-    """Load image and create GenAI Part object for google.genai client."""
-    with open(image_path, "rb") as f:
-        image_bytes = f.read()
+_IMAGE_MIME_TYPES = {
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg"
+}
+
 
-    ext = Path(image_path).suffix.lower()
-    mime = "image/jpeg"
-    if ext == ".png":
-        mime = "image/png"
-    elif ext == ".webp":
-        mime = "image/webp"
+def _read_image_bytes_and_mime(image_path: str, image_bytes: Optional[bytes] = None):
+    """Return (image bytes, MIME type), reading the file only if image_bytes is not given."""
+    if image_bytes is None:
+        with open(image_path, "rb") as f:
+            image_bytes = f.read()
+    mime = _IMAGE_MIME_TYPES.get(Path(image_path).suffix.lower(), "image/jpeg")
+    return image_bytes, mime
 
+
+def load_image_part(image_path: str, image_bytes: Optional[bytes] = None) -> "types.Part":
+    """Load image and create GenAI Part object for google.genai client.
+
+    Pass image_bytes to reuse bytes already read from image_path.
+    """
+    from google.genai import types
+
+    image_bytes, mime = _read_image_bytes_and_mime(image_path, image_bytes)
     return types.Part.from_bytes(data=image_bytes, mime_type=mime)
 
 
-def load_image_for_vertexai(image_path: str):
-    """Load image for Vertex AI GenerativeModel (returns raw image data)."""
-    from vertexai.preview.generative_models import Part, Image
+def load_image_for_vertexai(image_path: str, image_bytes: Optional[bytes] = None):
+    """Load image for Vertex AI GenerativeModel (returns raw image data).
 
-    ext = Path(image_path).suffix.lower()
-    mime = "image/jpeg"
-    if ext == ".png":
-        mime = "image/png"
-    elif ext == ".webp":
-        mime = "image/webp"
+    Pass image_bytes to reuse bytes already read from image_path.
+    """
+    from vertexai.preview.generative_models import Image
 
-    # Load image using Vertex AI's Image class
-    image = Image.load_from_file(image_path)
-    return image
+    # Vertex AI's Image detects the MIME type from the bytes itself
+    image_bytes, _ = _read_image_bytes_and_mime(image_path, image_bytes)
+    return Image.from_bytes(image_bytes)
 
 
 # ============================================================
 # TEXT PROCESSING
 # ============================================================
 
+_FENCE_OPEN = re.compile(r"^```(?:json)?\s*")
+_FENCE_CLOSE = re.compile(r"\s*```$")
+_JSON_TOKEN = re.compile(r'[{}"\\]')
+_INT_RE = re.compile(r"-?\d+")
+_FLOAT_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _first_nonspace(s: str) -> int:
+    """Index of the first non-whitespace character in s (len(s) if none)."""
+    i, n = 0, len(s)
+    while i < n and s[i].isspace():
+        i += 1
+    return i
+
+
+def _last_nonspace(s: str, start: int = 0) -> int:
+    """One past the index of the last non-whitespace character in s[start:]."""
+    j = len(s)
+    while j > start and s[j - 1].isspace():
+        j -= 1
+    return j
+
+
 def safe_json_text(model_text: str, context: str = "") -> str:
     """Validate that model output is valid JSON."""
-    txt = (model_text or "").strip()
-    if not (txt.startswith("{") and txt.endswith("}")):
+    # Scan in from both ends instead of strip() so large outputs are only copied
+    # once, after the check passes.
+    s = model_text or ""
+    i = _first_nonspace(s)
+    j = _last_nonspace(s, i)
+    if not (j > i and s[i] == "{" and s[j - 1] == "}"):
         raise RuntimeError(
-            f"Model output not valid JSON / truncated {context}:\n{txt[:500]}"
+            f"Model output not valid JSON / truncated {context}:\n{s[i:min(j, i + 500)]}"
         )
-    return txt
+    return s[i:j]
 
 
-def extract_first_json_object(text: str) -> Dict[str, Any]:
-    """Extract the first JSON object from text (handles markdown fences)."""
+def _first_balanced_json(s: str) -> Optional[str]:
+    """
+    Return the first brace-balanced {...} in s, or None if there is none.
+
+    Single linear pass over the structural characters; braces inside JSON strings
+    (including escaped quotes) are ignored.
+    """
+    start = s.find("{")
+    if start < 0:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped_at = -1
+    for match in _JSON_TOKEN.finditer(s, start):
+        ch, pos = match.group(), match.start()
+        if in_string:
+            if pos == escaped_at:
+                continue
+            if ch == "\\":
+                escaped_at = pos + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return s[start:pos + 1]
+    return None
+
+
+def extract_first_json_text(text: str) -> str:
+    """
+    Extract the first JSON object from text (handles markdown fences) without parsing it.
+
+    The result can be passed straight to a TypeAdapter's validate_json.
+    """
     text = (text or "").strip()
     if not text:
         raise ValueError("Empty model output text.")
 
     # Remove markdown code fences
-    text = re.sub(r"^```(?:json)?\s*", "", text)
-    text = re.sub(r"\s*```$", "", text)
-
-    # If pure JSON already
-    if text.startswith("{") and text.endswith("}"):
-        return json.loads(text)
+    text = _FENCE_OPEN.sub("", text)
+    text = _FENCE_CLOSE.sub("", text)
 
-    # Try to find first {...}
-    match = re.search(r"\{.*\}", text, flags=re.DOTALL)
-    if not match:
+    # Always scan: text that starts with { and ends with } may still hold several objects
+    obj = _first_balanced_json(text)
+    if obj is None:
         raise ValueError("No JSON object found in model output.")
-    return json.loads(match.group(0))
+    return obj
+
+
+def extract_first_json_object(text: str) -> Dict[str, Any]:
+    """Extract and parse the first JSON object from text (handles markdown fences)."""
+    return json.loads(extract_first_json_text(text))
 
 
 def build_prompt_with_schema(prompt_txt: str, schema_json: Dict[str, Any]) -> str:
@@ -150,7 +303,10 @@ def to_int_or_none(x: Any) -> Optional[int]:
         return int(x)
     if isinstance(x, str):
         s = x.strip()
-        m = re.search(r"-?\d+", s)
+        # Fast path for clean integer literals; messy text falls through to the regex
+        if s.isdecimal() or (s[:1] == "-" and s[1:].isdecimal()):
+            return int(s)
+        m = _INT_RE.search(s)
         if not m:
             return None
         try:
@@ -169,7 +325,11 @@ def to_float_or_none(x: Any) -> Optional[float]:
     if isinstance(x, str):
         s = x.strip()
         s = s.replace("%", "").strip()
-        m = re.search(r"-?\d+(?:\.\d+)?", s)
+        # Fast path for clean decimal literals (not "1e3", "nan", ".5", ...)
+        digits = s[1:] if s[:1] == "-" else s
+        if digits[:1].isdecimal() and digits.replace(".", "", 1).isdecimal():
+            return float(s)
+        m = _FLOAT_RE.search(s)
         if not m:
             return None
         try:
@@ -179,184 +339,253 @@ def to_float_or_none(x: Any) -> Optional[float]:
     return None
 
 
+def outcomes_frame(
+    trial_metadata: Dict[str, Any],
+    rows: List[Dict[str, Any]],
+    nested_key: Optional[str] = None
+) -> "pd.DataFrame":
+    """
+    Build an outcomes DataFrame with trial_metadata broadcast as the leading columns.
+
+    Row values win over trial_metadata on key collisions. If nested_key is given,
+    that dict field is flattened into "{nested_key}_*" columns.
+    """
+    import pandas as pd
+
+    rows = [r for r in rows if isinstance(r, dict)]
+    if nested_key:
+        rows = [
+            {
+                **{k: v for k, v in r.items() if k != nested_key},
+                **{f"{nested_key}_{k}": v for k, v in (r.get(nested_key) or {}).items()}
+            }
+            for r in rows
+        ]
+
+    df = pd.DataFrame.from_records(rows)
+    for key, value in trial_metadata.items():
+        if key not in df:
+            df[key] = value
+        else:
+            # Same as {**trial_metadata, **row}: only rows that carry the key override it
+            present = pd.Series([key in r for r in rows], index=df.index)
+            df[key] = df[key].where(present, value)
+    return df[list(trial_metadata) + [c for c in df.columns if c not in trial_metadata]]
+
+
+def trial_records_frame(rows: List[Dict[str, Any]]) -> "pd.DataFrame":
+    """
+    Build the flat trial_records DataFrame from dumped TrialRecord dicts.
+
+    Columns come from the static TRIAL_RECORD_COLUMNS schema, so rows are read
+    straight into per-column lists instead of being introspected by json_normalize.
+    """
+    import pandas as pd
+    from schemas import TRIAL_RECORD_COLUMNS
+
+    paths = [(column, column.split(".", 1)) for column in TRIAL_RECORD_COLUMNS]
+    columns: Dict[str, List[Any]] = {column: [] for column in TRIAL_RECORD_COLUMNS}
+    for row in rows:
+        for column, (key, *nested) in paths:
+            value = row.get(key)
+            if nested:
+                value = (value or {}).get(nested[0])
+            columns[column].append(value)
+    return pd.DataFrame(columns)
+
+
 # ============================================================
 # EXCEL UTILITIES
 # ============================================================
 
+def drop_empty_columns(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Drop columns whose values are all None/NaN or blank strings."""
+    from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+    if df.shape[1] == 0:
+        return df
+
+    def is_empty(col: "pd.Series") -> bool:
+        missing = col.isna()
+        if missing.all():
+            return True
+        # Only text-like columns can hold blank strings; skip the str copy otherwise
+        if is_numeric_dtype(col.dtype) or is_datetime64_any_dtype(col.dtype):
+            return False
+        return bool((missing | col.astype(str).str.strip().eq("")).all())
+
+    empty = df.apply(is_empty).astype(bool)
+    return df.loc[:, ~empty.to_numpy()]
+
+
 def cleanup_excel_empty_columns(excel_path: str):
     """
     Remove columns that have no data (all None/NaN/empty) from an Excel file.
 
+    Deprecated: extractors call drop_empty_columns on each DataFrame before
+    writing, which avoids re-reading and rewriting the workbook.
+
     Args:
         excel_path: Path to the Excel file to clean up
     """
+    warnings.warn(
+        "cleanup_excel_empty_columns is deprecated; use drop_empty_columns before to_excel",
+        DeprecationWarning,
+        stacklevel=2
+    )
+    import pandas as pd
+
     if not Path(excel_path).exists():
         return
 
     # Read the Excel file (handle multi-sheet if needed)
     excel_file = pd.ExcelFile(excel_path)
 
-    with pd.ExcelWriter(excel_path, engine="openpyxl") as writer:
-        for sheet_name in excel_file.sheet_names:
-            df = pd.read_excel(excel_file, sheet_name=sheet_name)
-
-            # Remove columns where all values are NaN/None/empty
-            df = df.dropna(axis=1, how='all')
+    sheets = {
+        sheet_name: pd.read_excel(excel_file, sheet_name=sheet_name)
+        for sheet_name in excel_file.sheet_names
+    }
+    excel_file.close()
+
+    # Write the cleaned workbook next to the original, then swap it in atomically
+    tmp_path = str(Path(excel_path).with_suffix(".tmp.xlsx"))
+    try:
+        with pd.ExcelWriter(
+            tmp_path, engine="xlsxwriter", engine_kwargs={"options": {"strings_to_urls": False}}
+        ) as writer:
+            for sheet_name, df in sheets.items():
+                # Remove columns where all values are NaN/None/empty strings
+                df = drop_empty_columns(df)
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, excel_path)
+
+
+def compute_output_folders(image_id: str) -> dict:
+    """
+    Compute output folder paths for a given image_id (no filesystem access).
 
-            # Also remove columns where all values are empty strings
-            for col in df.columns:
-                if df[col].astype(str).str.strip().eq('').all():
-                    df = df.drop(columns=[col])
+    Returns dict with paths:
+    - excel_folder: excel_output/{image_id}/
+    - json_folder: json_output/{image_id}/
+    """
+    from config import EXCEL_OUTPUT_FOLDER, JSON_OUTPUT_FOLDER
 
-            # Write cleaned dataframe back
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return {
+        "excel_folder": str(Path(EXCEL_OUTPUT_FOLDER) / image_id),
+        "json_folder": str(Path(JSON_OUTPUT_FOLDER) / image_id)
+    }
 
 
 def create_output_folders(image_id: str) -> dict:
     """
     Create output folder structure for a given image_id.
 
-    Returns dict with paths:
-    - excel_folder: excel_output/{image_id}/
-    - json_folder: json_output/{image_id}/
+    Returns the same dict as compute_output_folders.
     """
+    folders = compute_output_folders(image_id)
+    os.makedirs(folders["excel_folder"], exist_ok=True)
+    os.makedirs(folders["json_folder"], exist_ok=True)
+    return folders
+
+
+def consolidate_outputs(image_id: str):
+    """Consolidate all individual JSON and Excel outputs into final combined files."""
+    import pandas as pd
     from config import EXCEL_OUTPUT_FOLDER, JSON_OUTPUT_FOLDER
+    from schemas import MultiTrialExtractionOutput
 
     excel_folder = Path(EXCEL_OUTPUT_FOLDER) / image_id
     json_folder = Path(JSON_OUTPUT_FOLDER) / image_id
 
-    excel_folder.mkdir(parents=True, exist_ok=True)
-    json_folder.mkdir(parents=True, exist_ok=True)
+    pooled_json_path = json_folder / f"{image_id}_pooled_population.json"
 
-    return {
-        "excel_folder": str(excel_folder),
-        "json_folder": str(json_folder)
+    if pooled_json_path.exists():
+        pooled = load_trusted(MultiTrialExtractionOutput, str(pooled_json_path))
+    else:
+        pooled = MultiTrialExtractionOutput()
+
+    consolidated_json = {
+        "trial_records": pooled.trial_records,
+        "arm_records": pooled.arm_records,
+        "KM": None,
+        "Baseline": None,
+        "Response": None
     }
 
+    km_json_path = json_folder / f"{image_id}_km_survival.json"
+    if km_json_path.exists():
+        consolidated_json["KM"] = load_json(str(km_json_path))
+
+    baseline_json_path = json_folder / f"{image_id}_baseline.json"
+    if baseline_json_path.exists():
+        consolidated_json["Baseline"] = load_json(str(baseline_json_path))
+
+    response_json_path = json_folder / f"{image_id}_response_outcomes.json"
+    if response_json_path.exists():
+        consolidated_json["Response"] = load_json(str(response_json_path))
+
+    consolidated_json_path = json_folder / f"{image_id}.json"
+    save_json(consolidated_json, str(consolidated_json_path))
+    logger.info(f"Saved consolidated JSON: {consolidated_json_path}")
+
+    consolidated_excel_path = excel_folder / f"{image_id}.xlsx"
+    sheet_count = 0
+
+    with pd.ExcelWriter(
+        str(consolidated_excel_path), engine="xlsxwriter", engine_kwargs={"options": {"strings_to_urls": False}}
+    ) as writer:
+        if consolidated_json["trial_records"]:
+            trial_df = trial_records_frame(consolidated_json["trial_records"])
+            drop_empty_columns(trial_df).to_excel(writer, sheet_name="trial_records", index=False)
+            sheet_count += 1
+
+        if consolidated_json["arm_records"]:
+            arm_df = pd.DataFrame(consolidated_json["arm_records"])
+            drop_empty_columns(arm_df).to_excel(writer, sheet_name="arm_records", index=False)
+            sheet_count += 1
+
+        if consolidated_json["KM"]:
+            km_data = consolidated_json["KM"]
+            km_df = outcomes_frame(
+                km_data.get("trial_metadata", {}) or {},
+                km_data.get("arm_level_survival_outcomes", []) or []
+            )
+
+            if not km_df.empty:
+                drop_empty_columns(km_df).to_excel(writer, sheet_name="KM", index=False)
+                sheet_count += 1
+
+        if consolidated_json["Baseline"]:
+            baseline_data = consolidated_json["Baseline"]
+            bc_rows = baseline_data.get("bc_types", []) or []
+
+            if bc_rows:
+                baseline_df = pd.DataFrame.from_records(bc_rows)
+                drop_empty_columns(baseline_df).to_excel(writer, sheet_name="Baseline", index=False)
+                sheet_count += 1
+
+        if consolidated_json["Response"]:
+            response_data = consolidated_json["Response"]
+            response_df = outcomes_frame(
+                response_data.get("trial_metadata", {}) or {},
+                response_data.get("arm_level_response_outcomes", []) or [],
+                nested_key="result"
+            )
+
+            if not response_df.empty:
+                drop_empty_columns(response_df).to_excel(writer, sheet_name="Response", index=False)
+                sheet_count += 1
+
+        if sheet_count == 0:
+            pd.DataFrame({"info": ["No data available"]}).to_excel(writer, sheet_name="Summary", index=False)
+            logger.warning(f"No data found for {image_id}, created summary sheet")
+
+    logger.info(f"Saved consolidated Excel with {sheet_count} sheet(s): {consolidated_excel_path}")
 
-# def consolidate_outputs(image_id: str):
-#     """Consolidate all individual JSON and Excel outputs into final combined files."""
-#     from config import EXCEL_OUTPUT_FOLDER, JSON_OUTPUT_FOLDER
-
-#     excel_folder = Path(EXCEL_OUTPUT_FOLDER) / image_id
-#     json_folder = Path(JSON_OUTPUT_FOLDER) / image_id
-
-#     pooled_json_path = json_folder / f"{image_id}_pooled_population.json"
-
-#     if pooled_json_path.exists():
-#         pooled_data = load_json(str(pooled_json_path))
-
-#         consolidated_json = {
-#             "trial_records": pooled_data.get("trial_records", []),
-#             "arm_records": pooled_data.get("arm_records", []),
-#             "KM": None,
-#             "Baseline": None,
-#             "Response": None
-#         }
-#     else:
-#         consolidated_json = {
-#             "trial_records": [],
-#             "arm_records": [],
-#             "KM": None,
-#             "Baseline": None,
-#             "Response": None
-#         }
-
-#     km_json_path = json_folder / f"{image_id}_km_survival.json"
-#     if km_json_path.exists():
-#         consolidated_json["KM"] = load_json(str(km_json_path))
-
-#     baseline_json_path = json_folder / f"{image_id}_baseline.json"
-#     if baseline_json_path.exists():
-#         consolidated_json["Baseline"] = load_json(str(baseline_json_path))
-
-#     response_json_path = json_folder / f"{image_id}_response_outcomes.json"
-#     if response_json_path.exists():
-#         consolidated_json["Response"] = load_json(str(response_json_path))
-
-#     consolidated_json_path = json_folder / f"{image_id}.json"
-#     save_json(consolidated_json, str(consolidated_json_path))
-#     logger.info(f"Saved consolidated JSON: {consolidated_json_path}")
-
-#     consolidated_excel_path = excel_folder / f"{image_id}.xlsx"
-#     sheet_count = 0
-
-#     with pd.ExcelWriter(str(consolidated_excel_path), engine="openpyxl") as writer:
-#         if consolidated_json["trial_records"]:
-#             trial_df = pd.json_normalize(consolidated_json["trial_records"])
-#             trial_df.to_excel(writer, sheet_name="trial_records", index=False)
-#             sheet_count += 1
-
-#         if consolidated_json["arm_records"]:
-#             arm_df = pd.DataFrame(consolidated_json["arm_records"])
-#             arm_df.to_excel(writer, sheet_name="arm_records", index=False)
-#             sheet_count += 1
-
-#         if consolidated_json["KM"]:
-#             km_data = consolidated_json["KM"]
-#             trial_metadata = km_data.get("trial_metadata", {}) or {}
-#             arm_outcomes = km_data.get("arm_level_survival_outcomes", []) or []
-
-#             rows = []
-#             for row in arm_outcomes:
-#                 if isinstance(row, dict):
-#                     merged = {**trial_metadata, **row}
-#                     rows.append(merged)
-
-#             if rows:
-#                 km_df = pd.DataFrame(rows)
-#                 km_df.to_excel(writer, sheet_name="KM", index=False)
-#                 sheet_count += 1
-
-#         if consolidated_json["Baseline"]:
-#             baseline_data = consolidated_json["Baseline"]
-#             bc_rows = baseline_data.get("bc_types", []) or []
-
-#             if bc_rows:
-#                 baseline_df = pd.DataFrame(bc_rows)
-#                 baseline_df.to_excel(writer, sheet_name="Baseline", index=False)
-#                 sheet_count += 1
-
-#         if consolidated_json["Response"]:
-#             response_data = consolidated_json["Response"]
-#             trial_metadata = response_data.get("trial_metadata", {}) or {}
-#             arm_outcomes = response_data.get("arm_level_response_outcomes", []) or []
-
-#             flattened_rows = []
-#             for row in arm_outcomes:
-#                 if not isinstance(row, dict):
-#                     continue
-
-#                 result = row.pop("result", {}) or {}
-#                 flattened = {
-#                     **trial_metadata,
-#                     **row,
-#                     "result_n": result.get("n"),
-#                     "result_percentage": result.get("percentage"),
-#                     "result_min": result.get("min"),
-#                     "result_max": result.get("max"),
-#                     "result_p_value": result.get("p_value"),
-#                     "result_odds_ratio": result.get("odds_ratio"),
-#                     "result_median": result.get("median"),
-#                     "result_min_duration": result.get("min_duration"),
-#                     "result_max_duration": result.get("max_duration"),
-#                     "result_duration_unit": result.get("duration_unit")
-#                 }
-#                 flattened_rows.append(flattened)
-
-#             if flattened_rows:
-#                 response_df = pd.DataFrame(flattened_rows)
-#                 response_df.to_excel(writer, sheet_name="Response", index=False)
-#                 sheet_count += 1
-
-#         if sheet_count == 0:
-#             pd.DataFrame({"info": ["No data available"]}).to_excel(writer, sheet_name="Summary", index=False)
-#             logger.warning(f"No data found for {image_id}, created summary sheet")
-
-#     cleanup_excel_empty_columns(str(consolidated_excel_path))
-#     logger.info(f"Saved consolidated Excel with {sheet_count} sheet(s): {consolidated_excel_path}")
-
-#     return {
-#         "json_path": str(consolidated_json_path),
-#         "excel_path": str(consolidated_excel_path)
-#     }
+    return {
+        "json_path": str(consolidated_json_path),
+        "excel_path": str(consolidated_excel_path)
+    }